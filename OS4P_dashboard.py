@@ -1,12 +1,12 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-import plotly.express as px
 from fpdf import FPDF  # pip install fpdf2
 from PIL import Image  # Added for image handling
 
+from os4p_core import (calculate_diesel_lcoe, calculate_os4p, capital_recovery_factor, perform_sensitivity_analysis,
+                       perform_tornado_analysis)
+
 st.set_page_config(page_title="OS4P Green Sentinel", layout="wide")
 
 # ---------------------- Video Playback on Startup ---------------------- #
@@ -24,193 +24,120 @@ if not st.session_state["video_viewed"]:
 else:
     # ---------------------- Application Code Below ---------------------- #
 
-    def calculate_innovation_fund_score(cost_efficiency_ratio):
-        """
-        Calculate Innovation Fund score based on cost efficiency ratio
-        
-        For INNOVFUND-2024-NZT-PILOTS topic:
-        - If cost efficiency ratio is ≤ 2000 EUR/t CO₂-eq: Score = 12 - (12 × (ratio / 2000))
-        - Otherwise: 0 points
-        
-        Returns rounded to the nearest half point (min 0, max 12)
-        """
-        if cost_efficiency_ratio <= 2000:
-            score = 12 - (12 * (cost_efficiency_ratio / 2000))
-            score = round(score * 2) / 2
-            return max(0, score)
-        else:
-            return 0
-
-    def calculate_os4p(params):
-        # Extract user-defined constants from params
-        num_outposts = params["num_outposts"]
-        large_patrol_fuel = params["large_patrol_fuel"]
-        rib_fuel = params["rib_fuel"]
-        small_patrol_fuel = params["small_patrol_fuel"]
-        hours_per_day_base = params["hours_per_day_base"]
-        interest_rate = params["interest_rate"]
-        loan_years = params["loan_years"]
-        sla_premium = params["sla_premium"]
-        operating_days_per_year = params["operating_days_per_year"]
-        co2_factor = params["co2_factor"]
-        maintenance_emissions = params["maintenance_emissions"]
-
-        # Aggregated CAPEX value
-        total_capex_per_outpost = params["total_capex_per_outpost"]
-
-        # OPEX Inputs
-        maintenance_opex = params["maintenance_opex"]
-        communications_opex = params["communications_opex"]
-        security_opex = params["security_opex"]
-
-        # Optional detailed CAPEX components (for visualization only)
-        detailed_capex = params.get("detailed_capex", None)
-
-        # Fuel consumption inputs for additional equipment
-        diesel_generator_count = params.get("number_diesel_generators", 1)
-        genset_fuel_per_day = params["genset_fuel_per_hour"] * params["genset_operating_hours"] * diesel_generator_count
-        ms240_gd_fuel_per_day = params["num_ms240_gd_vehicles"] * params["ms240_gd_fuel_consumption"] * hours_per_day_base
-
-        # Updated CO₂ Emissions Calculation:
-        # Daily fuel consumption from vessel counts plus generator systems
-        daily_fuel_consumption = (
-            (params["num_large_patrol_boats"] * large_patrol_fuel +
-             params["num_rib_boats"] * rib_fuel +
-             params["num_small_patrol_boats"] * small_patrol_fuel) * hours_per_day_base
-        ) + genset_fuel_per_day + ms240_gd_fuel_per_day
-
-        annual_fuel_consumption = daily_fuel_consumption * operating_days_per_year
-
-        # Manned emissions based solely on the manned scenario inputs (kg CO₂/year)
-        manned_co2_emissions = annual_fuel_consumption * co2_factor
-        autonomous_co2_emissions = maintenance_emissions  # (kg CO₂/year)
-
-        # Calculate total GHG Emission Avoidance (tonnes CO₂/year)
-        ghg_abs_avoidance = (manned_co2_emissions - autonomous_co2_emissions) / 1000
-        lifetime_years = params["lifetime_years"]
-        ghg_abs_avoidance_lifetime = ghg_abs_avoidance * lifetime_years
-
-        if manned_co2_emissions > 0:
-            ghg_rel_avoidance = ((manned_co2_emissions - autonomous_co2_emissions) / manned_co2_emissions) * 100
-        else:
-            ghg_rel_avoidance = 0
-
-        # NEW: Use a single total annual absolute avoidance value (remove per-outpost calculations)
-        ghg_abs_avoidance_total = ghg_abs_avoidance
-
-        # Financial Calculations using the CAPEX and OPEX values
-        total_capex = total_capex_per_outpost * num_outposts
-        annual_opex_per_outpost = maintenance_opex + communications_opex + security_opex
-        annual_opex = annual_opex_per_outpost * num_outposts
-        lifetime_opex = annual_opex * loan_years
-
-        pilot_markup = total_capex * 1.25
-        non_unit_cost_pct = params.get("non_unit_cost_pct", 0)
-        non_unit_cost = pilot_markup * (non_unit_cost_pct / 100)
-        total_pilot_cost = pilot_markup + non_unit_cost
-
-        # Financing: 60% by grant, 40% by loan
-        total_grant = 0.60 * total_pilot_cost
-        debt = 0.40 * total_pilot_cost
-
-        monthly_interest_rate = interest_rate / 100 / 12
-        num_months = loan_years * 12
-        monthly_debt_payment = (debt * monthly_interest_rate) / (1 - (1 + monthly_interest_rate) ** -num_months)
-        lifetime_debt_payment = monthly_debt_payment * num_months
-
-        sla_multiplier = 1 + sla_premium / 100
-        monthly_fee_unit = (monthly_debt_payment / num_outposts) * sla_multiplier
-        annual_fee_unit = monthly_fee_unit * 12
-        lifetime_fee_total = annual_fee_unit * num_outposts * loan_years
-
-        if annual_fee_unit * num_outposts > 0:
-            payback_years = lifetime_debt_payment / (annual_fee_unit * num_outposts)
-        else:
-            payback_years = float('inf')
-
-        cost_efficiency_per_ton = total_grant / ghg_abs_avoidance_total if ghg_abs_avoidance_total > 0 else float('inf')
-        cost_efficiency_lifetime = total_grant / ghg_abs_avoidance_lifetime if ghg_abs_avoidance_lifetime > 0 else float('inf')
-
-        innovation_fund_score = calculate_innovation_fund_score(cost_efficiency_per_ton)
-        innovation_fund_score_lifetime = calculate_innovation_fund_score(cost_efficiency_lifetime)
-
-        tco = total_capex + lifetime_opex
-        tco_per_outpost = tco / num_outposts
-
-        r = interest_rate / 100
-        n = loan_years
-        CRF = (r * (1+r)**n) / ((1+r)**n - 1) if ((1+r)**n - 1) != 0 else 0
-        annualized_capex = total_capex_per_outpost * CRF
-        annual_energy = params["annual_energy_production"]
-        lcoe = (annualized_capex + annual_opex_per_outpost) / annual_energy
-
-        capex_breakdown = {
-            "Total CAPEX": total_capex_per_outpost * num_outposts
-        }
-
-        result = {
-            "ghg_abs_avoidance_total": ghg_abs_avoidance_total,
-            "ghg_abs_avoidance_lifetime": ghg_abs_avoidance_lifetime,
-            "ghg_rel_avoidance": ghg_rel_avoidance,
-            "daily_fuel_consumption": daily_fuel_consumption,
-            "manned_co2_emissions": manned_co2_emissions,
-            "autonomous_co2_emissions": autonomous_co2_emissions,
-            "total_capex": total_capex,
-            "total_capex_per_outpost": total_capex_per_outpost,
-            "annual_opex": annual_opex,
-            "annual_opex_per_outpost": annual_opex_per_outpost,
-            "lifetime_opex": lifetime_opex,
-            "tco": tco,
-            "tco_per_outpost": tco_per_outpost,
-            "monthly_debt_payment": monthly_debt_payment,
-            "monthly_fee_unit": monthly_fee_unit,
-            "annual_fee_unit": annual_fee_unit,
-            "lifetime_fee_total": lifetime_fee_total,
-            "cost_efficiency_per_ton": cost_efficiency_per_ton,
-            "cost_efficiency_lifetime": cost_efficiency_lifetime,
-            "innovation_fund_score": innovation_fund_score,
-            "innovation_fund_score_lifetime": innovation_fund_score_lifetime,
-            "pilot_markup": pilot_markup,
-            "non_unit_cost": non_unit_cost,
-            "total_pilot_cost": total_pilot_cost,
-            "total_grant": total_grant,
-            "debt": debt,
-            "lifetime_debt_payment": lifetime_debt_payment,
-            "lcoe": lcoe,
-            "payback_years": payback_years,
-            "capex_breakdown": capex_breakdown,
-            "opex_breakdown": {
-                "Maintenance": maintenance_opex * num_outposts,
-                "Communications": communications_opex * num_outposts,
-                "Security": security_opex * num_outposts
-            },
-            "co2_factors": {
-                "Manned Emissions (tonnes)": manned_co2_emissions / 1000,
-                "Autonomous Emissions (tonnes)": autonomous_co2_emissions / 1000
-            }
-        }
-
-        if detailed_capex:
-            result["detailed_capex_breakdown"] = detailed_capex
-
-        return result
-
-    def perform_sensitivity_analysis(params, selected_param, range_values):
-        import pandas as pd
-        sensitivity_data = []
-        for value in range_values:
-            new_params = params.copy()
-            new_params[selected_param] = value
-            result = calculate_os4p(new_params)
-            sensitivity_data.append({
-                'Parameter_Value': value,
-                'Absolute_Avoidance_Total': result['ghg_abs_avoidance_total'],
-                'Manned_CO2_Emissions': result['manned_co2_emissions'],
-                'Autonomous_CO2_Emissions': result['autonomous_co2_emissions'],
-                'Relative_Avoidance': result['ghg_rel_avoidance']
-            })
-        return pd.DataFrame(sensitivity_data)
-
+    # Human-readable labels for the parameters offered in the sensitivity analysis
+    PARAM_LABELS = {
+        "large_patrol_fuel": "Large Patrol Boat Fuel (L/h)",
+        "rib_fuel": "RIB Boat Fuel (L/h)",
+        "small_patrol_fuel": "Small Patrol Boat Fuel (L/h)",
+        "hours_per_day_base": "Patrol Hours per Day",
+        "operating_days_per_year": "Operating Days per Year",
+        "co2_factor": "CO₂ Factor (kg CO₂/L)",
+        "maintenance_emissions": "Maintenance Emissions (kg CO₂)"
+    }
+
+    # Default sweep range for each sensitivity parameter
+    SENSITIVITY_RANGES = {
+        "large_patrol_fuel": {"min": 50, "max": 300, "step": 25},
+        "rib_fuel": {"min": 10, "max": 100, "step": 10},
+        "small_patrol_fuel": {"min": 5, "max": 50, "step": 5},
+        "hours_per_day_base": {"min": 4, "max": 24, "step": 2},
+        "operating_days_per_year": {"min": 200, "max": 365, "step": 20},
+        "co2_factor": {"min": 0.5, "max": 3.0, "step": 0.25},
+        "maintenance_emissions": {"min": 500, "max": 5000, "step": 500}
+    }
+
+    # Sensitivity parameters that only take whole-number values
+    INTEGER_PARAMS = frozenset({"hours_per_day_base", "operating_days_per_year"})
+
+    # Checkbox label -> parameters varied together in the multi-parameter (tornado) analysis
+    TORNADO_PARAM_GROUPS = {
+        "Patrol Boat Fuel Consumption": ("large_patrol_fuel", "rib_fuel"),
+        "Operational Parameters": ("operating_days_per_year", "hours_per_day_base"),
+        "Emissions Parameters": ("co2_factor", "maintenance_emissions")
+    }
+
+    # Sidebar section -> (input name, label, st.number_input options) for the plain numeric inputs.
+    # Keys of model parameters match the names calculate_os4p reads from params.
+    SIDEBAR_INPUTS = {
+        "Vessel/Asset Count - Manned Scenario": (
+            ("num_large_patrol_boats", "Number of Large Patrol Boats", dict(min_value=0, max_value=10, value=1, step=1, format="%d")),
+            ("num_rib_boats", "Number of RIB Boats", dict(min_value=0, max_value=10, value=1, step=1, format="%d", key="num_rib_boats_vessels")),
+            ("num_small_patrol_boats", "Number of Small Patrol Boats", dict(min_value=0, max_value=10, value=1, step=1, format="%d")),
+            ("num_ms240_gd_vehicles", "Number of M/S 240 GD Patrol Vehicles", dict(min_value=0, max_value=100, value=1, step=1, format="%d")),
+            ("number_diesel_generators", "Number of Diesel Generators", dict(min_value=1, max_value=50, value=1, step=1, format="%d"))
+        ),
+        "Fuel Consumption (Liters per Hour) - Manned Scenario": (
+            ("large_patrol_fuel", "Large Patrol Boat Fuel (L/h)", dict(min_value=50, max_value=300, value=150, step=10, format="%d")),
+            ("rib_fuel", "RIB Boat Fuel (L/h)", dict(min_value=10, max_value=100, value=50, step=5, format="%d", key="rib_boat_fuel")),
+            ("small_patrol_fuel", "Small Patrol Boat Fuel (L/h)", dict(min_value=5, max_value=50, value=30, step=5, format="%d")),
+            ("hours_per_day_base", "Patrol Hours per Day", dict(min_value=4, max_value=24, value=8, step=1, format="%d"))
+        ),
+        "Additional Fuel Consumption Parameters": (
+            ("ms240_gd_fuel_consumption", "M/S 240 GD Patrol Vehicle Fuel Consumption (L/h)", dict(min_value=0, max_value=25, value=15, step=10, format="%d")),
+            ("diesel_generator_capex", "Diesel Generator CAPEX (€)", dict(min_value=10000, max_value=200000, value=50000, step=5000, format="%d")),
+            ("diesel_generator_opex", "Diesel Generator Annual OPEX (€)", dict(min_value=1000, max_value=20000, value=3000, step=500, format="%d")),
+            ("diesel_fuel_cost", "Diesel Fuel Cost (€/liter)", dict(min_value=0.5, max_value=2.0, value=1.5, step=0.1, format="%.1f")),
+            ("diesel_generator_efficiency", "Diesel Generator Efficiency (kWh per liter)", dict(min_value=0.1, max_value=5.0, value=2.5, step=0.1, format="%.1f")),
+            ("genset_fuel_per_hour", "GENSET Fuel Consumption per Hour (L/h)", dict(min_value=0.1, max_value=10.0, value=2.5, step=0.1, format="%.1f")),
+            ("genset_operating_hours", "GENSET Operating Hours per Day", dict(min_value=1, max_value=24, value=24, step=1, format="%d"))
+        ),
+        "Operational Parameters": (
+            ("operating_days_per_year", "Operating Days per Year", dict(min_value=50, max_value=365, value=180, step=1, format="%d")),
+            ("co2_factor", "CO₂ Factor (kg CO₂ per liter)", dict(min_value=0.5, max_value=5.0, value=2.63, step=0.1, format="%.1f"))
+        ),
+        "Financial Parameters": (
+            ("interest_rate", "Interest Rate (%)", dict(min_value=1.0, max_value=15.0, value=4.2, step=0.1, format="%.1f")),
+            ("loan_years", "Project Loan Years (for financial calculations)", dict(min_value=3, max_value=25, value=10, step=1, format="%d")),
+            ("sla_premium", "SLA Premium (%)", dict(min_value=0.0, max_value=50.0, value=10.0, step=1.0, format="%.1f")),
+            ("non_unit_cost_pct", "Non-unit Cost (%)", dict(min_value=0.0, max_value=100.0, value=25.0, step=0.1, format="%.1f")),
+            ("corporate_tax_rate", "Corporate Tax Rate (%)", dict(min_value=0.0, max_value=100.0, value=22.0, step=0.1, format="%.1f")),
+            ("cogs_pct", "COGS as % of Total CAPEX", dict(min_value=0.0, max_value=100.0, value=10.0, step=0.1, format="%.1f")),
+            ("working_cap_pct", "Working Capital as % of Revenue", dict(min_value=0.0, max_value=20.0, value=5.0, step=0.1, format="%.1f"))
+        ),
+        "Asset Lifetime": (
+            ("lifetime_years", "OS4P Unit Lifetime (years)", dict(min_value=1, max_value=50, value=20, step=1, format="%d")),
+        ),
+        "OS4P Emissions": (
+            ("maintenance_emissions", "Maintenance Emissions (kg CO₂)", dict(min_value=500, max_value=20000, value=1594, step=10, format="%d")),
+        ),
+        "Energy Production": (
+            ("annual_energy_production", "Annual Energy Production per Outpost (kWh/year)", dict(min_value=1000, max_value=100000, value=20000, step=1000, format="%d")),
+        )
+    }
+
+    # OPEX inputs are rendered after the CAPEX section
+    OPEX_INPUTS = {
+        "OPEX Inputs (€ per Outpost per Year)": (
+            ("maintenance_opex", "Maintenance OPEX", dict(min_value=500, max_value=5000, value=2000, step=1000, format="%d")),
+            ("communications_opex", "Communications OPEX", dict(min_value=500, max_value=1500, value=1000, step=1000, format="%d")),
+            ("security_opex", "Security OPEX", dict(min_value=0, max_value=1000, value=0, step=1000, format="%d"))
+        )
+    }
+
+    # Sidebar inputs that only feed the dashboard tabs and are kept out of the cached model's params
+    NON_MODEL_INPUTS = frozenset({
+        "diesel_generator_capex", "diesel_generator_opex", "diesel_fuel_cost", "diesel_generator_efficiency",
+        "cogs_pct", "working_cap_pct"
+    })
+
+    def sidebar_number_inputs(sections):
+        """Render each section's number inputs and return their values keyed by input name."""
+        values = {}
+        for section, fields in sections.items():
+            st.subheader(section)
+            for name, label, options in fields:
+                values[name] = st.number_input(label, **options)
+        return values
+
+    # Bar labels of the CO₂ emissions comparison chart
+    CO2_COMPARISON_LABELS = ("Manned Emissions (tonnes)", "Autonomous Emissions (tonnes)")
+
+    # Layout shared by the Plotly sensitivity charts; each chart adds only its titles.
+    # Unified hover shows every series at the hovered parameter value, as on the DCF chart.
+    SENSITIVITY_LAYOUT = {"hovermode": "x unified"}
+
+    # The report only changes with the model outputs, so reruns reuse the rendered bytes
+    @st.cache_data(max_entries=32)
     def generate_pdf(results, params, lcoe_breakdown):
         pdf = FPDF()
         pdf.unifontsubset = False
@@ -274,12 +201,13 @@ else:
         pdf.set_font("DejaVu", "B", 12)
         pdf.cell(0, 10, "Calculation Breakdown:", ln=True)
         pdf.set_font("DejaVu", "", 12)
-        for index, row in lcoe_breakdown.iterrows():
-            pdf.cell(0, 10, f"{row['Metric']}: {row['Value']:.2f}", ln=True)
+        for metric, value in zip(lcoe_breakdown["Metric"], lcoe_breakdown["Value"].to_numpy()):
+            pdf.cell(0, 10, f"{metric}: {value:.2f}", ln=True)
         
         pdf_bytes = pdf.output(dest="S").encode("latin1", errors="replace")
         return pdf_bytes
 
+    @st.cache_resource(max_entries=32)
     def create_cost_breakdown_chart(capex_breakdown, opex_breakdown, detailed_capex=None):
         import plotly.graph_objects as go
         labels = list(capex_breakdown.keys()) + list(opex_breakdown.keys())
@@ -292,14 +220,16 @@ else:
         fig.update_layout(title="Cost Breakdown")
         return fig
 
-    def create_co2_comparison_chart(co2_factors):
+    @st.cache_resource(max_entries=32)
+    def create_co2_comparison_chart(manned_tonnes, autonomous_tonnes):
         import plotly.graph_objects as go
-        labels = list(co2_factors.keys())
-        values = list(co2_factors.values())
-        fig = go.Figure(data=[go.Bar(x=labels, y=values, text=values, textposition='auto')])
+        # Two plain floats make a cheap, stable cache key compared with hashing a dict
+        values = (manned_tonnes, autonomous_tonnes)
+        fig = go.Figure(data=[go.Bar(x=CO2_COMPARISON_LABELS, y=values, text=[f"{v:.1f}" for v in values], textposition='auto')])
         fig.update_layout(title="CO₂ Emissions Comparison", yaxis_title="Emissions (tonnes)")
         return fig
 
+    @st.cache_resource(max_entries=32)
     def create_payback_period_chart(payback_years):
         import plotly.graph_objects as go
         fig = go.Figure()
@@ -320,75 +250,221 @@ else:
         )
         return fig
 
-    def create_sensitivity_chart(df, parameter_name, y_col, y_label):
-        import plotly.express as px
-        fig = px.line(
-            df,
-            x='Parameter_Value',
-            y=y_col,
-            title=f"Sensitivity Analysis: {parameter_name}",
-            labels={'Parameter_Value': parameter_name, y_col: y_label}
-        )
-        return fig
-
+    @st.cache_resource(max_entries=32)
     def create_emissions_sensitivity_chart(df, parameter_name):
-        import plotly.express as px
-        fig = px.line(
-            df,
-            x='Parameter_Value',
-            y='Manned_CO2_Emissions',
-            title=f"Emissions Sensitivity: {parameter_name}",
-            labels={'Parameter_Value': parameter_name, 'Manned_CO2_Emissions': 'Manned CO₂ Emissions (kg/year)'}
+        import plotly.graph_objects as go
+        fig = go.Figure(
+            [
+                go.Scatter(x=df['Parameter_Value'], y=df['Manned_CO2_Emissions'], mode='lines', name='Manned CO₂ Emissions'),
+                go.Scatter(x=df['Parameter_Value'], y=df['Autonomous_CO2_Emissions'], mode='lines', name='Autonomous CO₂ Emissions')
+            ],
+            layout={**SENSITIVITY_LAYOUT, 'title': f"Emissions Sensitivity: {parameter_name}",
+                    'xaxis_title': parameter_name, 'yaxis_title': 'Manned CO₂ Emissions (kg/year)'}
         )
-        fig.add_scatter(x=df['Parameter_Value'], y=df['Autonomous_CO2_Emissions'], mode='lines', name='Autonomous CO₂ Emissions')
         return fig
 
+    @st.cache_resource(max_entries=32)
     def create_innovation_fund_score_chart(df, parameter_name):
-        import plotly.express as px
-        fig = px.line(
-            df,
-            x='Parameter_Value',
-            y='Relative_Avoidance',
-            title=f"Innovation Fund Score Sensitivity: {parameter_name}",
-            labels={'Parameter_Value': parameter_name, 'Relative_Avoidance': 'Relative GHG Avoidance (%)'}
+        import plotly.graph_objects as go
+        fig = go.Figure(
+            go.Scatter(x=df['Parameter_Value'], y=df['Innovation_Fund_Score'], mode='lines'),
+            layout={**SENSITIVITY_LAYOUT, 'title': f"Innovation Fund Score Sensitivity: {parameter_name}",
+                    'xaxis_title': parameter_name, 'yaxis_title': 'Innovation Fund Score (0-12)'}
         )
         return fig
 
+    @st.cache_resource(max_entries=32)
     def create_combined_sensitivity_graph(df, parameter_name):
         import plotly.graph_objects as go
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df['Parameter_Value'],
-            y=df['Absolute_Avoidance_Total'],
-            mode='lines+markers',
-            name='Absolute Avoidance'
-        ))
-        fig.add_trace(go.Scatter(
-            x=df['Parameter_Value'],
-            y=df['Manned_CO2_Emissions'],
-            mode='lines+markers',
-            name='Manned CO₂ Emissions'
-        ))
-        fig.add_trace(go.Scatter(
-            x=df['Parameter_Value'],
-            y=df['Autonomous_CO2_Emissions'],
-            mode='lines+markers',
-            name='Autonomous CO₂ Emissions'
-        ))
-        fig.add_trace(go.Scatter(
-            x=df['Parameter_Value'],
-            y=df['Relative_Avoidance'],
-            mode='lines+markers',
-            name='Relative Avoidance (%)'
-        ))
-        fig.update_layout(
-            title=f"Combined Sensitivity Analysis: {parameter_name}",
-            xaxis_title=parameter_name,
-            yaxis_title="Values"
+        series_names = {
+            'Absolute_Avoidance_Total': 'Absolute Avoidance',
+            'Manned_CO2_Emissions': 'Manned CO₂ Emissions',
+            'Autonomous_CO2_Emissions': 'Autonomous CO₂ Emissions',
+            'Relative_Avoidance': 'Relative Avoidance (%)'
+        }
+        # One labelled trace per column, read straight from the frame without reshaping it
+        fig = go.Figure(
+            [
+                go.Scatter(x=df['Parameter_Value'], y=df[col], mode='lines+markers', name=name)
+                for col, name in series_names.items()
+            ],
+            layout={**SENSITIVITY_LAYOUT, 'title': f"Combined Sensitivity Analysis: {parameter_name}",
+                    'xaxis_title': parameter_name, 'yaxis_title': "Values"}
         )
         return fig
 
+    # st.fragment (Streamlit >= 1.33) reruns only the decorated panel when its own widgets change
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+    @fragment
+    def sensitivity_panel(params):
+        st.subheader("CO₂ Emissions Sensitivity Analysis")
+        
+        col1, col2 = st.columns([2, 3])
+        with col1:
+            selected_param = st.selectbox(
+                "Parameter to analyze:",
+                tuple(PARAM_LABELS),
+                format_func=PARAM_LABELS.get
+            )
+            param_label = PARAM_LABELS[selected_param]
+            setting = SENSITIVITY_RANGES[selected_param]
+            min_val_default = setting["min"]
+            max_val_default = setting["max"]
+            step = setting["step"]
+            
+            min_range = st.number_input("Minimum value:", value=min_val_default, step=step)
+            max_range = st.number_input("Maximum value:", value=max_val_default, step=step)
+            num_steps = st.number_input("Number of data points:", value=10, min_value=5, max_value=20, step=1)
+        
+        with col2:
+            if min_range >= max_range:
+                st.error("Minimum value must be less than maximum value!")
+            else:
+                range_values = np.linspace(min_range, max_range, int(num_steps))
+                if selected_param in INTEGER_PARAMS:
+                    # Truncating a narrow range repeats values; keep each whole number once
+                    range_values = np.unique(np.round(range_values).astype(int))
+                sensitivity_results = perform_sensitivity_analysis(params, selected_param, range_values)
+                st.markdown("#### Sensitivity Analysis Results:")
+                # Display formats are applied by the frontend instead of a pandas Styler formatting every cell
+                column_formats = {
+                    'Parameter_Value': '%.2f' if selected_param == "co2_factor" else '%.0f',
+                    'Absolute_Avoidance_Total': '%.2f',
+                    'Manned_CO2_Emissions': '%.2f',
+                    'Autonomous_CO2_Emissions': '%.2f',
+                    'Relative_Avoidance': '%.2f',
+                    'Innovation_Fund_Score': '%.1f'
+                }
+                st.dataframe(
+                    sensitivity_results,
+                    column_config={col: st.column_config.NumberColumn(format=fmt) for col, fmt in column_formats.items()}
+                )
+        
+        st.markdown("#### Sensitivity Analysis Visualizations")
+        col1, col2 = st.columns(2)
+        with col1:
+            # A single series needs no Plotly features; Streamlit's native chart ships a far smaller spec
+            st.markdown(f"**Sensitivity Analysis: {param_label}**")
+            # The native chart titles its axes with the plotted column names
+            avoidance_title = 'Total Absolute GHG Emission Avoidance (tCO₂e/year)'
+            avoidance_df = sensitivity_results[['Parameter_Value', 'Absolute_Avoidance_Total']].rename(
+                columns={'Parameter_Value': param_label, 'Absolute_Avoidance_Total': avoidance_title}
+            )
+            st.line_chart(avoidance_df, x=param_label, y=avoidance_title, use_container_width=True)
+        with col2:
+            emissions_chart = create_emissions_sensitivity_chart(
+                sensitivity_results,
+                param_label
+            )
+            st.plotly_chart(emissions_chart, use_container_width=True)
+        
+        st.markdown("#### Innovation Fund Score Sensitivity")
+        innovation_score_chart = create_innovation_fund_score_chart(
+            sensitivity_results,
+            param_label
+        )
+        st.plotly_chart(innovation_score_chart, use_container_width=True)
+
+        st.markdown("#### Combined Sensitivity Analysis")
+        combined_chart = create_combined_sensitivity_graph(
+            sensitivity_results,
+            param_label
+        )
+        st.plotly_chart(combined_chart, use_container_width=True)
+        
+        st.markdown("""
+        This chart shows how the Innovation Fund score changes with the parameter value. 
+        Higher scores (closer to 12) improve funding chances. Scores use the formula:
+
+        **Score = 12 - (12 × cost efficiency ratio / 2000)** when ratio ≤ 2000 EUR/t, otherwise 0.
+        """)
+
+    # The tornado form is its own fragment, so submitting it doesn't rerun the sweep panel above
+    @fragment
+    def tornado_panel(params, results):
+        st.subheader("Multi-Parameter Impact Analysis")
+        st.markdown("Analyze the impact of multiple parameters simultaneously:")
+        with st.form("multi_parameter_analysis"):
+            selected_groups = []
+            for group in TORNADO_PARAM_GROUPS:
+                if st.checkbox(group, value=True):
+                    selected_groups.append(group)
+            
+            variation_pct = st.slider("Parameter Variation (%)", min_value=5, max_value=50, value=20, step=5,
+                                  help="Percentage variation from the base case")
+            run_multi_parameter_analysis = st.form_submit_button("Run Multi-Parameter Analysis")
+        
+        # The base case is the configuration already evaluated for the rest of the dashboard
+        base_avoidance = results['ghg_abs_avoidance_total']
+
+        if run_multi_parameter_analysis:
+            tornado_params = [param for group in selected_groups for param in TORNADO_PARAM_GROUPS[group]]
+            
+            if tornado_params:
+                import plotly.graph_objects as go
+                # Columns are assembled directly from arrays rather than a list of row dicts
+                impacts = perform_tornado_analysis(params, tuple(tornado_params), variation_pct, base_avoidance)
+                total_impact = np.abs(impacts).sum(axis=1)
+                # Rank on the NumPy array and build the frame already in order instead of sorting it in pandas
+                order = np.argsort(-total_impact, kind='stable')
+                tornado_df = pd.DataFrame({
+                    'Parameter': [PARAM_LABELS.get(tornado_params[i], tornado_params[i]) for i in order],
+                    'Low_Value': impacts[order, 0],
+                    'High_Value': impacts[order, 1],
+                    'Total_Impact': total_impact[order]
+                })
+                
+                fig = go.Figure(
+                    data=[
+                        go.Bar(
+                            y=tornado_df['Parameter'],
+                            x=tornado_df['High_Value'],
+                            name='Positive Impact',
+                            orientation='h',
+                            marker=dict(color='#66b3ff')
+                        ),
+                        go.Bar(
+                            y=tornado_df['Parameter'],
+                            x=tornado_df['Low_Value'],
+                            name='Negative Impact',
+                            orientation='h',
+                            marker=dict(color='#ff9999')
+                        )
+                    ],
+                    layout=dict(
+                        title=f'Tornado Chart: Impact on Total Absolute GHG Emission Avoidance (±{variation_pct}% variation)',
+                        xaxis_title='Change in Total Absolute GHG Emission Avoidance (tCO₂e/year)',
+                        barmode='overlay',
+                        legend=dict(orientation="h", y=1.1, x=0.5, xanchor='center'),
+                        margin=dict(l=100)
+                    )
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                st.markdown(f"""
+                ### Interpretation:
+                - This chart shows sensitivity of total GHG avoidance to parameter changes.
+                - Longer bars indicate greater impact.
+                - Blue bars: increase by {variation_pct}%
+                - Red bars: decrease by {variation_pct}%
+                """)
+                st.subheader("Parameter Elasticity")
+                st.markdown("""
+                This measures the responsiveness (elasticity) of GHG avoidance to a 1% change in each parameter.
+                Higher absolute values mean more influence.
+                """)
+                # Elasticity is undefined when the base case avoids nothing
+                elasticity_scale = base_avoidance * (variation_pct / 100)
+                tornado_df['Elasticity'] = tornado_df['High_Value'].to_numpy() / elasticity_scale if elasticity_scale != 0 else np.nan
+                elasticity_df = tornado_df[['Parameter', 'Elasticity']].sort_values('Elasticity', ascending=False, key=abs)
+                st.dataframe(elasticity_df, column_config={'Elasticity': st.column_config.NumberColumn(format='%.3f')})
+            else:
+                st.warning("Please select at least one parameter group to analyze.")
+
     def main():
+        # Plotly is imported on first use so the start-up video page doesn't pay for it
+        import plotly.graph_objects as go
+
         st.title("OS4P Green Sentinel")
         st.markdown("### Configure Your OS4P System Below")
         
@@ -410,67 +486,7 @@ else:
             num_outposts = maritime_outposts + land_border_outposts + interior_outposts
             st.markdown(f"**Total Number of Outposts: {num_outposts}**")
             
-            st.subheader("Vessel/Asset Count - Manned Scenario")
-            num_large_patrol_boats = st.number_input("Number of Large Patrol Boats", min_value=0, max_value=10, value=1, step=1, format="%d")
-            num_rib_boats = st.number_input(
-                "Number of RIB Boats", 
-                min_value=0, max_value=10, value=1, step=1, format="%d", 
-                key="num_rib_boats_vessels"
-            )
-            num_small_patrol_boats = st.number_input("Number of Small Patrol Boats", min_value=0, max_value=10, value=1, step=1, format="%d")
-            num_ms240_gd_vehicles = st.number_input("Number of M/S 240 GD Patrol Vehicles", min_value=0, max_value=100, value=1, step=1, format="%d")
-            
-            # Input for diesel generators
-            number_diesel_generators = st.number_input("Number of Diesel Generators", min_value=1, max_value=50, value=1, step=1, format="%d")
-           
-            st.subheader("Fuel Consumption (Liters per Hour) - Manned Scenario")
-            large_patrol_fuel = st.number_input("Large Patrol Boat Fuel (L/h)", min_value=50, max_value=300, value=150, step=10, format="%d")
-            rib_fuel = st.number_input(
-                "RIB Boat Fuel (L/h)", 
-                min_value=10, max_value=100, value=50, step=5, format="%d", 
-                key="rib_boat_fuel"
-            )
-            small_patrol_fuel = st.number_input("Small Patrol Boat Fuel (L/h)", min_value=5, max_value=50, value=30, step=5, format="%d")
-        
-            hours_per_day_base = st.number_input("Patrol Hours per Day", min_value=4, max_value=24, value=8, step=1, format="%d")
-                   
-            st.subheader("Additional Fuel Consumption Parameters")
-            ms240_gd_fuel_consumption = st.number_input("M/S 240 GD Patrol Vehicle Fuel Consumption (L/h)", min_value=0, max_value=25, value=15, step=10, format="%d")
-            diesel_generator_capex = st.number_input("Diesel Generator CAPEX (€)", min_value=10000, max_value=200000, value=50000, step=5000, format="%d")
-            diesel_generator_opex = st.number_input("Diesel Generator Annual OPEX (€)", min_value=1000, max_value=20000, value=3000, step=500, format="%d")
-            diesel_fuel_cost = st.number_input("Diesel Fuel Cost (€/liter)", min_value=0.5, max_value=2.0, value=1.5, step=0.1, format="%.1f")
-            diesel_generator_efficiency = st.number_input("Diesel Generator Efficiency (kWh per liter)", min_value=0.1, max_value=5.0, value=2.5, step=0.1, format="%.1f")
-            genset_fuel_per_hour = st.number_input("GENSET Fuel Consumption per Hour (L/h)", min_value=0.1, max_value=10.0, value=2.5, step=0.1, format="%.1f")
-            genset_operating_hours = st.number_input("GENSET Operating Hours per Day", min_value=1, max_value=24, value=24, step=1, format="%d")
-            
-            st.subheader("Operational Parameters")
-            operating_days_per_year = st.number_input("Operating Days per Year", min_value=50, max_value=365, value=180, step=1, format="%d")
-            co2_factor = st.number_input("CO₂ Factor (kg CO₂ per liter)", min_value=0.5, max_value=5.0, value=2.63, step=0.1, format="%.1f")
-            
-            st.subheader("Financial Parameters")
-            interest_rate = st.number_input("Interest Rate (%)", min_value=1.0, max_value=15.0, value=4.2, step=0.1, format="%.1f")
-            loan_years = st.number_input("Project Loan Years (for financial calculations)", min_value=3, max_value=25, value=10, step=1, format="%d")
-            sla_premium = st.number_input("SLA Premium (%)", min_value=0.0, max_value=50.0, value=10.0, step=1.0, format="%.1f")
-            non_unit_cost_pct = st.number_input("Non-unit Cost (%)", min_value=0.0, max_value=100.0, value=25.0, step=0.1, format="%.1f")
-            corporate_tax_rate = st.number_input("Corporate Tax Rate (%)", min_value=0.0, max_value=100.0, value=22.0, step=0.1, format="%.1f")
-            cogs_pct = st.number_input("COGS as % of Total CAPEX", min_value=0.0, max_value=100.0, value=10.0, step=0.1, format="%.1f")
-            working_cap_pct = st.number_input("Working Capital as % of Revenue", min_value=0.0, max_value=20.0, value=5.0, step=0.1, format="%.1f")
-            
-            st.subheader("Asset Lifetime")
-            lifetime_years = st.number_input("OS4P Unit Lifetime (years)", min_value=1, max_value=50, value=20, step=1, format="%d")
-            
-            st.subheader("OS4P Emissions")
-            maintenance_emissions = st.number_input("Maintenance Emissions (kg CO₂)", min_value=500, max_value=20000, value=1594, step=10, format="%d")
-                  
-            st.subheader("Energy Production")
-            annual_energy_production = st.number_input(
-                "Annual Energy Production per Outpost (kWh/year)", 
-                min_value=1000, 
-                max_value=100000, 
-                value=20000, 
-                step=1000, 
-                format="%d"
-            )
+            inputs = sidebar_number_inputs(SIDEBAR_INPUTS)
             
             st.subheader("CAPEX Summary (€ per Outpost)")
             show_capex_detail = st.checkbox("Show detailed CAPEX breakdown", value=False)
@@ -509,39 +525,12 @@ else:
                 drones_capex = 0
                 bos_capex = 0
             
-            st.subheader("OPEX Inputs (€ per Outpost per Year)")
-            maintenance_opex = st.number_input("Maintenance OPEX", min_value=500, max_value=5000, value=2000, step=1000, format="%d")
-            communications_opex = st.number_input("Communications OPEX", min_value=500, max_value=1500, value=1000, step=1000, format="%d")
-            security_opex = st.number_input("Security OPEX", min_value=0, max_value=1000, value=0, step=1000, format="%d")
+            inputs.update(sidebar_number_inputs(OPEX_INPUTS))
         
         # Build parameters dictionary:
         params = {
             "num_outposts": num_outposts,
-            "large_patrol_fuel": large_patrol_fuel,
-            "rib_fuel": rib_fuel,
-            "small_patrol_fuel": small_patrol_fuel,
-            "hours_per_day_base": hours_per_day_base,
-            "genset_fuel_per_hour": genset_fuel_per_hour,
-            "genset_operating_hours": genset_operating_hours,
-            "num_ms240_gd_vehicles": num_ms240_gd_vehicles,
-            "ms240_gd_fuel_consumption": ms240_gd_fuel_consumption,
-            "interest_rate": interest_rate,
-            "loan_years": loan_years,
-            "sla_premium": sla_premium,
-            "non_unit_cost_pct": non_unit_cost_pct,
-            "corporate_tax_rate": corporate_tax_rate,
-            "lifetime_years": lifetime_years,
-            "operating_days_per_year": operating_days_per_year,
-            "co2_factor": co2_factor,
-            "maintenance_emissions": maintenance_emissions,
-            "maintenance_opex": maintenance_opex,
-            "communications_opex": communications_opex,
-            "security_opex": security_opex,
-            "annual_energy_production": annual_energy_production,
-            "num_large_patrol_boats": num_large_patrol_boats,
-            "num_rib_boats": num_rib_boats,
-            "num_small_patrol_boats": num_small_patrol_boats,
-            "number_diesel_generators": number_diesel_generators,
+            **{name: value for name, value in inputs.items() if name not in NON_MODEL_INPUTS},
             "total_capex_per_outpost": total_capex_per_outpost
         }
         if show_capex_detail:
@@ -564,6 +553,9 @@ else:
             params["bos_capex"] = bos_capex
 
         results = calculate_os4p(params)
+        # The overview metrics and the CO₂ chart both show emissions in tonnes; convert once
+        manned_tonnes = results["manned_co2_emissions"] / 1000
+        autonomous_tonnes = results["autonomous_co2_emissions"] / 1000
 
         # Define tabs; combine Financial Details and Financial Model into one:
         tab_intro, tab_overview, tab_innovation, tab_financial, tab_lcoe, tab_visualizations, tab_sensitivity = st.tabs(
@@ -595,9 +587,9 @@ else:
             st.subheader("Environmental Impact")
             col_em1, col_em2 = st.columns(2)
             with col_em1:
-                st.metric("Manned Emissions (tonnes/year)", f"{results['manned_co2_emissions']/1000:.1f}")
+                st.metric("Manned Emissions (tonnes/year)", f"{manned_tonnes:.1f}")
             with col_em2:
-                st.metric("Autonomous Emissions (tonnes/year)", f"{results['autonomous_co2_emissions']/1000:.1f}")
+                st.metric("Autonomous Emissions (tonnes/year)", f"{autonomous_tonnes:.1f}")
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -653,10 +645,13 @@ else:
             """)
             
             st.markdown("### Enter Your Scores")
-            degree_innovation = st.slider("Degree of Innovation (9-15)", min_value=9, max_value=15, value=12)
-            project_maturity = st.slider("Project Maturity (0-15)", min_value=0, max_value=15, value=10)
-            replicability = st.slider("Replicability (0-15)", min_value=0, max_value=15, value=10)
-            bonus_points = st.slider("Bonus Points (0-4)", min_value=0, max_value=4, value=2)
+            # Sliders inside a form only trigger a rerun when the scores are submitted, not on every drag step
+            with st.form("innovation_scores"):
+                degree_innovation = st.slider("Degree of Innovation (9-15)", min_value=9, max_value=15, value=12)
+                project_maturity = st.slider("Project Maturity (0-15)", min_value=0, max_value=15, value=10)
+                replicability = st.slider("Replicability (0-15)", min_value=0, max_value=15, value=10)
+                bonus_points = st.slider("Bonus Points (0-4)", min_value=0, max_value=4, value=2)
+                st.form_submit_button("Update Scores")
             
             lifetime_years = params["lifetime_years"]
             threshold_abs = 1000 * (lifetime_years / 10)
@@ -678,13 +673,16 @@ else:
             total_innovation_score = (degree_innovation * 2) + ghg_emission_avoidance_score + project_maturity + replicability + cost_efficiency_score + bonus_points
             
             st.markdown("### Calculated Scores")
-            st.write(f"**Degree of Innovation (weighted):** {degree_innovation * 2:.1f} (Input: {degree_innovation})")
-            st.write(f"**GHG Emission Avoidance Potential:** {ghg_emission_avoidance_score:.1f} (Absolute: {absolute_score:.1f}, Relative: {relative_score}, Quality: {quality_score:.1f})")
-            st.write(f"**Project Maturity:** {project_maturity:.1f}")
-            st.write(f"**Replicability:** {replicability:.1f}")
-            st.write(f"**Cost Efficiency Score:** {cost_efficiency_score:.1f} (Calculated from cost efficiency ratio)")
-            st.write(f"**Bonus Points:** {bonus_points:.1f}")
-            st.write(f"**Total Innovation Fund Score:** {total_innovation_score:.1f} (Maximum without bonus: 87, with bonus: 91)")
+            # One markdown message instead of one st.write round-trip per score line
+            st.markdown("\n\n".join([
+                f"**Degree of Innovation (weighted):** {degree_innovation * 2:.1f} (Input: {degree_innovation})",
+                f"**GHG Emission Avoidance Potential:** {ghg_emission_avoidance_score:.1f} (Absolute: {absolute_score:.1f}, Relative: {relative_score}, Quality: {quality_score:.1f})",
+                f"**Project Maturity:** {project_maturity:.1f}",
+                f"**Replicability:** {replicability:.1f}",
+                f"**Cost Efficiency Score:** {cost_efficiency_score:.1f} (Calculated from cost efficiency ratio)",
+                f"**Bonus Points:** {bonus_points:.1f}",
+                f"**Total Innovation Fund Score:** {total_innovation_score:.1f} (Maximum without bonus: 87, with bonus: 91)"
+            ]))
         
         with tab_financial:
             st.header("Financial Overview")
@@ -713,55 +711,47 @@ else:
             """)
 
             # Financial parameters
-            discount_rate = interest_rate / 100
-            years = loan_years
+            discount_rate = params["interest_rate"] / 100
+            years = params["loan_years"]
             initial_investment = results["debt"]
 
             # Revenue and debt service
-            annual_revenue = (results["annual_fee_unit"] + maintenance_opex) * num_outposts
+            annual_revenue = (results["annual_fee_unit"] + params["maintenance_opex"]) * num_outposts
             annual_debt_service = results["monthly_debt_payment"] * 12
 
             # Calculate cash flows
             annual_cash_flow = annual_revenue - annual_debt_service
             undiscounted_cash_flows = [annual_cash_flow] * years
 
-            # Calculate discounted cash flows
-            discounted_cash_flows = []
-            cumulative_discounted_cash_flow = -initial_investment
-            payback_year = None
-
-            for t in range(1, years + 1):
-                discounted_cf = annual_cash_flow / ((1 + discount_rate) ** t)
-                discounted_cash_flows.append(discounted_cf)
-                cumulative_discounted_cash_flow += discounted_cf
-                if cumulative_discounted_cash_flow >= 0 and payback_year is None:
-                    payback_year = t
+            # Calculate discounted cash flows in one pass over the year vector
+            cash_flow_years = np.arange(1, years + 1)
+            discounted_cash_flows = annual_cash_flow / (1 + discount_rate) ** cash_flow_years
+            cumulative_discounted_cash_flow = np.cumsum(discounted_cash_flows) - initial_investment
+            payback_index = np.flatnonzero(cumulative_discounted_cash_flow >= 0)
+            payback_year = int(cash_flow_years[payback_index[0]]) if payback_index.size else None
 
-            # Create graph
+            # Create graph: traces and layout go into one constructor instead of incremental add_trace calls
             year_list = list(range(1, years + 1))
-            fig = go.Figure()
-
-            # Add undiscounted cash flow
-            fig.add_trace(go.Scatter(
-                x=year_list,
-                y=undiscounted_cash_flows,
-                mode='lines+markers',
-                name='Undiscounted Cash Flow',
-                line=dict(color='blue', dash='dot')
-            ))
-
-            # Add discounted cash flow
-            fig.add_trace(go.Scatter(
-                x=year_list,
-                y=discounted_cash_flows,
-                mode='lines+markers',
-                name='Discounted Cash Flow',
-                line=dict(color='green')
-            ))
+            dcf_traces = [
+                go.Scatter(
+                    x=year_list,
+                    y=undiscounted_cash_flows,
+                    mode='lines+markers',
+                    name='Undiscounted Cash Flow',
+                    line=dict(color='blue', dash='dot')
+                ),
+                go.Scatter(
+                    x=year_list,
+                    y=discounted_cash_flows,
+                    mode='lines+markers',
+                    name='Discounted Cash Flow',
+                    line=dict(color='green')
+                )
+            ]
 
             # Highlight payback year
             if payback_year:
-                fig.add_trace(go.Scatter(
+                dcf_traces.append(go.Scatter(
                     x=[payback_year],
                     y=[0],
                     mode='markers+text',
@@ -770,11 +760,14 @@ else:
                     textposition='top center'
                 ))
 
-            fig.update_layout(
-                title='Discounted Cash Flow Analysis',
-                xaxis_title='Year',
-                yaxis_title='Cash Flow (€)',
-                hovermode='x unified'
+            fig = go.Figure(
+                data=dcf_traces,
+                layout=dict(
+                    title='Discounted Cash Flow Analysis',
+                    xaxis_title='Year',
+                    yaxis_title='Cash Flow (€)',
+                    hovermode='x unified'
+                )
             )
 
             st.plotly_chart(fig, use_container_width=True)
@@ -796,26 +789,23 @@ else:
             operating_expenses = maintenance_cost + sg_and_a
 
             # Interest expense only during the loan term
-            interest_expense = [
-                results["debt"] * (interest_rate / 100) if year <= loan_years else 0
-                for year in range(1, lifetime_years + 1)
-            ]
+            pl_years = np.arange(1, lifetime_years + 1)
+            interest_expense = np.where(pl_years <= params["loan_years"], results["debt"] * (params["interest_rate"] / 100), 0.0)
 
             # Calculate profit metrics
             gross_profit = annual_revenue_total - operating_expenses
-            profit_before_tax = [gross_profit - interest for interest in interest_expense]
-            tax_amount = [pbt * (corporate_tax_rate / 100) if pbt > 0 else 0 for pbt in profit_before_tax]
-            net_profit = [pbt - tax for pbt, tax in zip(profit_before_tax, tax_amount)]
+            profit_before_tax = gross_profit - interest_expense
+            tax_amount = np.where(profit_before_tax > 0, profit_before_tax * (params["corporate_tax_rate"] / 100), 0.0)
+            net_profit = profit_before_tax - tax_amount
 
-            # Create the P&L DataFrame
-            pl_years = list(range(1, lifetime_years + 1))
+            # Create the P&L DataFrame; the constant yearly lines broadcast against the Year column
             pl_df = pd.DataFrame({
                 "Year": pl_years,
-                "Unit Fee Revenue (€)": [fee_revenue] * lifetime_years,
-                "Maintenance Revenue (€)": [maintenance_revenue] * lifetime_years,
-                "Total Revenue (€)": [annual_revenue_total] * lifetime_years,
-                "Operating Expenses (€)": [operating_expenses] * lifetime_years,
-                "Gross Profit (€)": [gross_profit] * lifetime_years,
+                "Unit Fee Revenue (€)": fee_revenue,
+                "Maintenance Revenue (€)": maintenance_revenue,
+                "Total Revenue (€)": annual_revenue_total,
+                "Operating Expenses (€)": operating_expenses,
+                "Gross Profit (€)": gross_profit,
                 "Interest Expense (€)": interest_expense,
                 "Profit Before Tax (€)": profit_before_tax,
                 "Tax (€)": tax_amount,
@@ -830,13 +820,11 @@ else:
             """)
             st.metric("LCOE (€/kWh)", f"{results['lcoe']:.4f}")
             
-            r = interest_rate / 100
-            n = loan_years
-            CRF = (r * (1+r)**n) / ((1+r)**n - 1) if ((1+r)**n - 1) != 0 else 0
+            CRF = capital_recovery_factor(params["interest_rate"] / 100, params["loan_years"])
             total_capex_per_outpost_calc = params["microgrid_capex"] + params["drones_capex"] + params["bos_capex"]
             annualized_capex = total_capex_per_outpost_calc * CRF
             annual_opex_per_outpost = results["annual_opex_per_outpost"]
-            annual_energy = annual_energy_production
+            annual_energy = params["annual_energy_production"]
             lcoe_breakdown = pd.DataFrame({
                 "Metric": ["Annualized CAPEX per Outpost (€/year)", "Annual OPEX per Outpost (€/year)", "Annual Energy Production (kWh/year)"],
                 "Value": [annualized_capex, annual_opex_per_outpost, annual_energy]
@@ -845,20 +833,21 @@ else:
             st.table(lcoe_breakdown)
 
             # Diesel Generator LCOE Calculation
-            annualized_capex_diesel = diesel_generator_capex * CRF
-            annual_fuel_consumption_diesel = params["genset_fuel_per_hour"] * params["genset_operating_hours"] * operating_days_per_year
-            annual_fuel_cost = annual_fuel_consumption_diesel * diesel_fuel_cost
-            diesel_opex_total = diesel_generator_opex
-            total_annualized_capex_diesel = annualized_capex_diesel * number_diesel_generators
-            total_diesel_opex = diesel_opex_total * number_diesel_generators
-            total_annual_fuel_cost = annual_fuel_cost * number_diesel_generators
-            annual_total_cost_diesel = total_annualized_capex_diesel + total_diesel_opex + total_annual_fuel_cost
-            annual_electricity_diesel = annual_fuel_consumption_diesel * diesel_generator_efficiency
-            annual_electricity_diesel_total = annual_electricity_diesel * number_diesel_generators
-            lcoe_diesel = annual_total_cost_diesel / annual_electricity_diesel_total if annual_electricity_diesel_total > 0 else float('inf')
+            diesel = calculate_diesel_lcoe(
+                inputs["diesel_generator_capex"],
+                inputs["diesel_generator_opex"],
+                inputs["diesel_fuel_cost"],
+                inputs["diesel_generator_efficiency"],
+                params["genset_fuel_per_hour"],
+                params["genset_operating_hours"],
+                params["operating_days_per_year"],
+                params["number_diesel_generators"],
+                params["interest_rate"],
+                params["loan_years"]
+            )
             
             st.markdown("### Diesel Generator LCOE Calculation")
-            st.metric("Diesel Generator LCOE (€/kWh)", f"{lcoe_diesel:.4f}")
+            st.metric("Diesel Generator LCOE (€/kWh)", f"{diesel['lcoe']:.4f}")
             diesel_lcoe_breakdown = pd.DataFrame({
                 "Metric": [
                     "Annualized CAPEX (€/year)",
@@ -868,11 +857,11 @@ else:
                     "Annual Electricity Production (kWh/year)"
                 ],
                 "Value": [
-                    annualized_capex_diesel,
-                    diesel_generator_opex,
-                    annual_fuel_cost,
-                    annual_total_cost_diesel,
-                    annual_electricity_diesel_total
+                    diesel["annualized_capex"],
+                    diesel["annual_opex"],
+                    diesel["annual_fuel_cost"],
+                    diesel["annual_total_cost"],
+                    diesel["annual_electricity"]
                 ]
             })
             st.markdown("**Diesel Generator LCOE Breakdown:**")
@@ -887,7 +876,7 @@ else:
             st.plotly_chart(cost_chart)
             
             st.subheader("CO₂ Emissions Comparison")
-            co2_chart = create_co2_comparison_chart(results["co2_factors"])
+            co2_chart = create_co2_comparison_chart(manned_tonnes, autonomous_tonnes)
             st.plotly_chart(co2_chart)
             
             st.subheader("Payback Period")
@@ -895,198 +884,10 @@ else:
             st.plotly_chart(payback_chart)
         
         with tab_sensitivity:
-            st.subheader("CO₂ Emissions Sensitivity Analysis")
-            
-            sensitivity_param_options = {
-                "large_patrol_fuel": "Large Patrol Boat Fuel (L/h)",
-                "rib_fuel": "RIB Boat Fuel (L/h)",
-                "small_patrol_fuel": "Small Patrol Boat Fuel (L/h)",
-                "hours_per_day_base": "Patrol Hours per Day",
-                "operating_days_per_year": "Operating Days per Year",
-                "co2_factor": "CO₂ Factor (kg CO₂/L)",
-                "maintenance_emissions": "Maintenance Emissions (kg CO₂)"
-            }
-            
-            sensitivity_settings = {
-                "large_patrol_fuel": {"min": 50, "max": 300, "step": 25},
-                "rib_fuel": {"min": 10, "max": 100, "step": 10},
-                "small_patrol_fuel": {"min": 5, "max": 50, "step": 5},
-                "hours_per_day_base": {"min": 4, "max": 24, "step": 2},
-                "operating_days_per_year": {"min": 200, "max": 365, "step": 20},
-                "co2_factor": {"min": 0.5, "max": 3.0, "step": 0.25},
-                "maintenance_emissions": {"min": 500, "max": 5000, "step": 500}
-            }
-            
-            col1, col2 = st.columns([2, 3])
-            with col1:
-                selected_param = st.selectbox(
-                    "Parameter to analyze:",
-                    list(sensitivity_param_options.keys()),
-                    format_func=lambda x: sensitivity_param_options[x]
-                )
-                setting = sensitivity_settings[selected_param]
-                min_val_default = setting["min"]
-                max_val_default = setting["max"]
-                step = setting["step"]
-                default_val = params.get(selected_param, min_val_default)
-                
-                min_range = st.number_input("Minimum value:", value=min_val_default, step=step)
-                max_range = st.number_input("Maximum value:", value=max_val_default, step=step)
-                num_steps = st.number_input("Number of data points:", value=10, min_value=5, max_value=20, step=1)
-            
-            with col2:
-                if min_range >= max_range:
-                    st.error("Minimum value must be less than maximum value!")
-                else:
-                    range_values = np.linspace(min_range, max_range, int(num_steps))
-                    if selected_param in ["hours_per_day_base", "operating_days_per_year"]:
-                        range_values = range_values.astype(int)
-                    sensitivity_results = perform_sensitivity_analysis(params, selected_param, range_values)
-                    st.markdown("#### Sensitivity Analysis Results:")
-                    format_dict = {
-                        'Parameter_Value': '{:.2f}' if selected_param == "co2_factor" else '{:.0f}',
-                        'Absolute_Avoidance_Total': '{:.2f}', 
-                        'Manned_CO2_Emissions': '{:.2f}',
-                        'Autonomous_CO2_Emissions': '{:.2f}',
-                        'Relative_Avoidance': '{:.2f}'
-                    }
-                    st.dataframe(sensitivity_results.style.format(format_dict))
-            
-            st.markdown("#### Sensitivity Analysis Visualizations")
-            col1, col2 = st.columns(2)
-            with col1:
-                avoidance_chart = create_sensitivity_chart(
-                    sensitivity_results, 
-                    sensitivity_param_options[selected_param],
-                    'Absolute_Avoidance_Total', 
-                    'Total Absolute GHG Emission Avoidance (tCO₂e/year)'
-                )
-                st.plotly_chart(avoidance_chart, use_container_width=True)
-            with col2:
-                emissions_chart = create_emissions_sensitivity_chart(
-                    sensitivity_results,
-                    sensitivity_param_options[selected_param]
-                )
-                st.plotly_chart(emissions_chart, use_container_width=True)
-            
-            st.markdown("#### Innovation Fund Score Sensitivity")
-            innovation_score_chart = create_innovation_fund_score_chart(
-                sensitivity_results,
-                sensitivity_param_options[selected_param]
-            )
-            st.plotly_chart(innovation_score_chart, use_container_width=True)
-
-            st.markdown("#### Combined Sensitivity Analysis")
-            combined_chart = create_combined_sensitivity_graph(
-                sensitivity_results,
-                sensitivity_param_options[selected_param]
-            )
-            st.plotly_chart(combined_chart, use_container_width=True)
-            
-            st.markdown("""
-            This chart shows how the Innovation Fund score changes with the parameter value. 
-            Higher scores (closer to 12) improve funding chances. Scores use the formula:
-
-            **Score = 12 - (12 × cost efficiency ratio / 2000)** when ratio ≤ 2000 EUR/t, otherwise 0.
-            """)
-            
-            st.subheader("Multi-Parameter Impact Analysis")
-            st.markdown("Analyze the impact of multiple parameters simultaneously:")
-            analyze_patrol_fuel = st.checkbox("Patrol Boat Fuel Consumption", value=True)
-            analyze_operations = st.checkbox("Operational Parameters", value=True)
-            analyze_emissions = st.checkbox("Emissions Parameters", value=True)
-            
-            variation_pct = st.slider("Parameter Variation (%)", min_value=5, max_value=50, value=20, step=5,
-                                  help="Percentage variation from the base case")
-            
-            def calculate_impact(param):
-                params_high = params.copy()
-                params_low = params.copy()
-                params_high[param] = params[param] * (1 + variation_pct / 100)
-                params_low[param] = params[param] * (1 - variation_pct / 100)
-                high_result = calculate_os4p(params_high)
-                low_result = calculate_os4p(params_low)
-                return {
-                    'Parameter': sensitivity_param_options.get(param, param),
-                    'Low_Value': low_result['ghg_abs_avoidance_total'] - base_avoidance,
-                    'High_Value': high_result['ghg_abs_avoidance_total'] - base_avoidance
-                }
-            
-            if st.button("Run Multi-Parameter Analysis"):
-                tornado_data = []
-                base_result = calculate_os4p(params)
-                base_avoidance = base_result['ghg_abs_avoidance_total']
-                
-                if analyze_patrol_fuel:
-                    for param in ["large_patrol_fuel", "rib_fuel"]:
-                        tornado_data.append(calculate_impact(param))
-                
-                if analyze_operations:
-                    for param in ["operating_days_per_year", "hours_per_day_base"]:
-                        tornado_data.append(calculate_impact(param))
-                
-                if analyze_emissions:
-                    for param in ["co2_factor", "maintenance_emissions"]:
-                        tornado_data.append(calculate_impact(param))
-                
-                if tornado_data:
-                    tornado_df = pd.DataFrame(tornado_data)
-                    tornado_df['Total_Impact'] = tornado_df['High_Value'].abs() + tornado_df['Low_Value'].abs()
-                    tornado_df = tornado_df.sort_values('Total_Impact', ascending=False)
-                    
-                    fig = go.Figure()
-                    fig.add_trace(go.Bar(
-                        y=tornado_df['Parameter'],
-                        x=tornado_df['High_Value'],
-                        name='Positive Impact',
-                        orientation='h',
-                        marker=dict(color='#66b3ff')
-                    ))
-                    fig.add_trace(go.Bar(
-                        y=tornado_df['Parameter'],
-                        x=tornado_df['Low_Value'],
-                        name='Negative Impact',
-                        orientation='h',
-                        marker=dict(color='#ff9999')
-                    ))
-                    fig.update_layout(
-                        title=f'Tornado Chart: Impact on Total Absolute GHG Emission Avoidance (±{variation_pct}% variation)',
-                        xaxis_title='Change in Total Absolute GHG Emission Avoidance (tCO₂e/year)',
-                        barmode='overlay',
-                        legend=dict(orientation="h", y=1.1, x=0.5, xanchor='center'),
-                        margin=dict(l=100)
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-                    st.markdown(f"""
-                    ### Interpretation:
-                    - This chart shows sensitivity of total GHG avoidance to parameter changes.
-                    - Longer bars indicate greater impact.
-                    - Blue bars: increase by {variation_pct}%
-                    - Red bars: decrease by {variation_pct}%
-                    """)
-                    st.subheader("Parameter Elasticity")
-                    st.markdown("""
-                    This measures the responsiveness (elasticity) of GHG avoidance to a 1% change in each parameter.
-                    Higher absolute values mean more influence.
-                    """)
-                    tornado_df['Elasticity'] = (tornado_df['High_Value'] / base_avoidance) / (variation_pct / 100)
-                    elasticity_df = tornado_df[['Parameter', 'Elasticity']].sort_values('Elasticity', ascending=False, key=abs)
-                    st.dataframe(elasticity_df.style.format({'Elasticity': '{:.3f}'}))
-                else:
-                    st.warning("Please select at least one parameter group to analyze.")
-        
-        r = interest_rate / 100
-        n = loan_years
-        CRF = (r * (1+r)**n) / ((1+r)**n - 1) if ((1+r)**n - 1) != 0 else 0
-        total_capex_per_outpost_calc = params["microgrid_capex"] + params["drones_capex"] + params["bos_capex"]
-        annualized_capex = total_capex_per_outpost_calc * CRF
-        annual_opex_per_outpost = results["annual_opex_per_outpost"]
-        annual_energy = annual_energy_production
-        lcoe_breakdown = pd.DataFrame({
-            "Metric": ["Annualized CAPEX per Outpost (€/year)", "Annual OPEX per Outpost (€/year)", "Annual Energy Production (kWh/year)"],
-            "Value": [annualized_capex, annual_opex_per_outpost, annual_energy]
-        })
+            sensitivity_panel(params)
+            tornado_panel(params, results)
         
+        # lcoe_breakdown was already built for the LCOE tab above
         pdf_bytes = generate_pdf(results, params, lcoe_breakdown)
         st.download_button(label="Download Executive Summary", data=pdf_bytes, file_name="OS4P_Report.pdf", mime="application/pdf")
 
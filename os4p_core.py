@@ -0,0 +1,302 @@
+"""
+Calculation core of the OS4P dashboard: emissions, financing and sensitivity sweeps.
+
+Kept free of UI code so Streamlit imports it once per process instead of
+re-executing it on every rerun of OS4P_dashboard.py.
+"""
+from collections import ChainMap
+from typing import NamedTuple
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+
+
+def calculate_innovation_fund_score(cost_efficiency_ratio):
+    """
+    Calculate Innovation Fund score based on cost efficiency ratio
+
+    For INNOVFUND-2024-NZT-PILOTS topic:
+    - If cost efficiency ratio is ≤ 2000 EUR/t CO₂-eq: Score = 12 - (12 × (ratio / 2000))
+    - Otherwise: 0 points
+
+    Returns rounded to the nearest half point (min 0, max 12)
+    """
+    if cost_efficiency_ratio <= 2000:
+        score = 12 - (12 * (cost_efficiency_ratio / 2000))
+        score = round(score * 2) / 2
+        return max(0, score)
+    else:
+        return 0
+
+
+def calculate_innovation_fund_score_vec(cost_efficiency_ratio):
+    """
+    Array version of calculate_innovation_fund_score, scoring a whole sweep in one pass.
+
+    Uses the same formula, half-point rounding and 2000 EUR/t cut-off as the scalar version.
+    """
+    ratio = np.asarray(cost_efficiency_ratio, dtype=np.float64)
+    score = np.round((12 - 12 * (ratio / 2000)) * 2) / 2
+    return np.where(ratio <= 2000, np.maximum(score, 0), 0.0)
+
+
+class EmissionsResult(NamedTuple):
+    daily_fuel_consumption: np.ndarray
+    manned_co2_emissions: np.ndarray
+    autonomous_co2_emissions: np.ndarray
+    ghg_abs_avoidance_total: np.ndarray
+    ghg_abs_avoidance_lifetime: np.ndarray
+    ghg_rel_avoidance: np.ndarray
+
+
+def calculate_os4p_vec(params, overrides=None):
+    """
+    Vectorized emissions core of calculate_os4p.
+
+    Any of the emissions inputs may be a NumPy array (e.g. a sensitivity sweep); the remaining
+    scalars broadcast against it, so a whole sweep is evaluated in one pass. Swept values are
+    passed in overrides, which take precedence over params and leave the caller's dict untouched.
+    """
+    if overrides:
+        # Layer the overrides over params instead of copying every entry into a merged dict
+        params = ChainMap(overrides, params)
+    hours_per_day_base = params["hours_per_day_base"]
+
+    # Fuel consumption inputs for additional equipment
+    diesel_generator_count = params.get("number_diesel_generators", 1)
+    genset_fuel_per_day = params["genset_fuel_per_hour"] * params["genset_operating_hours"] * diesel_generator_count
+    ms240_gd_fuel_per_day = params["num_ms240_gd_vehicles"] * params["ms240_gd_fuel_consumption"] * hours_per_day_base
+
+    # Updated CO₂ Emissions Calculation:
+    # Daily fuel consumption from vessel counts plus generator systems
+    daily_fuel_consumption = (
+        (params["num_large_patrol_boats"] * params["large_patrol_fuel"] +
+         params["num_rib_boats"] * params["rib_fuel"] +
+         params["num_small_patrol_boats"] * params["small_patrol_fuel"]) * hours_per_day_base
+    ) + genset_fuel_per_day + ms240_gd_fuel_per_day
+
+    annual_fuel_consumption = daily_fuel_consumption * params["operating_days_per_year"]
+
+    # Manned emissions based solely on the manned scenario inputs (kg CO₂/year)
+    manned_co2_emissions = np.asarray(annual_fuel_consumption * params["co2_factor"], dtype=np.float64)
+    autonomous_co2_emissions = np.asarray(params["maintenance_emissions"], dtype=np.float64)  # (kg CO₂/year)
+
+    # Calculate total GHG Emission Avoidance (tonnes CO₂/year)
+    avoided_co2_emissions = manned_co2_emissions - autonomous_co2_emissions
+    ghg_abs_avoidance_total = avoided_co2_emissions / 1000
+    ghg_abs_avoidance_lifetime = ghg_abs_avoidance_total * params["lifetime_years"]
+
+    safe_manned = np.where(manned_co2_emissions > 0, manned_co2_emissions, 1.0)
+    ghg_rel_avoidance = np.where(manned_co2_emissions > 0, avoided_co2_emissions / safe_manned * 100, 0.0)
+
+    return EmissionsResult(
+        daily_fuel_consumption=daily_fuel_consumption,
+        manned_co2_emissions=manned_co2_emissions,
+        autonomous_co2_emissions=autonomous_co2_emissions,
+        ghg_abs_avoidance_total=ghg_abs_avoidance_total,
+        ghg_abs_avoidance_lifetime=ghg_abs_avoidance_lifetime,
+        ghg_rel_avoidance=ghg_rel_avoidance
+    )
+
+
+def capital_recovery_factor(rate, periods):
+    """
+    Share of a present value recovered each period, r / (1 - (1+r)**-n).
+
+    This is the closed-form sum of the discounted annuity; at a zero rate it reduces to 1/n.
+    Shared by the loan payment and the LCOE so both use the same guarded geometric sum.
+    """
+    if abs(rate) < 1e-12:
+        return 1 / periods
+    return rate / (1 - (1 + rate) ** -periods)
+
+
+@st.cache_data(max_entries=256)
+def calculate_financials(num_outposts, total_capex_per_outpost, maintenance_opex, communications_opex,
+                         security_opex, non_unit_cost_pct, interest_rate, loan_years, sla_premium,
+                         annual_energy_production):
+    """
+    CAPEX/OPEX, financing and LCOE half of calculate_os4p.
+
+    None of these inputs feed the emissions block, so sweeps over emissions parameters
+    reuse the cached result instead of re-running the loan and LCOE math.
+    """
+    # Financial Calculations using the CAPEX and OPEX values
+    total_capex = total_capex_per_outpost * num_outposts
+    annual_opex_per_outpost = maintenance_opex + communications_opex + security_opex
+    opex_vec = np.array([maintenance_opex, communications_opex, security_opex]) * num_outposts
+    annual_opex = float(opex_vec.sum())
+    lifetime_opex = annual_opex * loan_years
+
+    pilot_markup = total_capex * 1.25
+    non_unit_cost = pilot_markup * (non_unit_cost_pct / 100)
+    total_pilot_cost = pilot_markup + non_unit_cost
+
+    # Financing: 60% by grant, 40% by loan
+    total_grant = 0.60 * total_pilot_cost
+    debt = 0.40 * total_pilot_cost
+
+    monthly_interest_rate = interest_rate / 100 / 12
+    num_months = loan_years * 12
+    monthly_debt_payment = debt * capital_recovery_factor(monthly_interest_rate, num_months)
+    lifetime_debt_payment = monthly_debt_payment * num_months
+
+    sla_multiplier = 1 + sla_premium / 100
+    monthly_fee_unit = (monthly_debt_payment / num_outposts) * sla_multiplier
+    annual_fee_unit = monthly_fee_unit * 12
+    lifetime_fee_total = annual_fee_unit * num_outposts * loan_years
+
+    if annual_fee_unit * num_outposts > 0:
+        payback_years = lifetime_debt_payment / (annual_fee_unit * num_outposts)
+    else:
+        payback_years = float('inf')
+
+    tco = total_capex + lifetime_opex
+    tco_per_outpost = tco / num_outposts
+
+    CRF = capital_recovery_factor(interest_rate / 100, loan_years)
+    annualized_capex = total_capex_per_outpost * CRF
+    lcoe = (annualized_capex + annual_opex_per_outpost) / annual_energy_production
+
+    capex_breakdown = {
+        "Total CAPEX": total_capex
+    }
+
+    return {
+        "total_capex": total_capex,
+        "total_capex_per_outpost": total_capex_per_outpost,
+        "annual_opex": annual_opex,
+        "annual_opex_per_outpost": annual_opex_per_outpost,
+        "lifetime_opex": lifetime_opex,
+        "tco": tco,
+        "tco_per_outpost": tco_per_outpost,
+        "monthly_debt_payment": monthly_debt_payment,
+        "monthly_fee_unit": monthly_fee_unit,
+        "annual_fee_unit": annual_fee_unit,
+        "lifetime_fee_total": lifetime_fee_total,
+        "pilot_markup": pilot_markup,
+        "non_unit_cost": non_unit_cost,
+        "total_pilot_cost": total_pilot_cost,
+        "total_grant": total_grant,
+        "debt": debt,
+        "lifetime_debt_payment": lifetime_debt_payment,
+        "lcoe": lcoe,
+        "payback_years": payback_years,
+        "capex_breakdown": capex_breakdown,
+        "opex_breakdown": dict(zip(["Maintenance", "Communications", "Security"], opex_vec.tolist()))
+    }
+
+
+@st.cache_data(max_entries=256)
+def calculate_diesel_lcoe(diesel_generator_capex, diesel_generator_opex, diesel_fuel_cost,
+                          diesel_generator_efficiency, genset_fuel_per_hour, genset_operating_hours,
+                          operating_days_per_year, number_diesel_generators, interest_rate, loan_years):
+    """
+    LCOE of the diesel generator fleet the OS4P units replace.
+
+    Depends only on the generator and financing scalars, so reruns that change anything
+    else reuse the cached breakdown.
+    """
+    annualized_capex = diesel_generator_capex * capital_recovery_factor(interest_rate / 100, loan_years)
+    annual_fuel_consumption = genset_fuel_per_hour * genset_operating_hours * operating_days_per_year
+    annual_fuel_cost = annual_fuel_consumption * diesel_fuel_cost
+
+    # Every generator has the same cost and output, so the fleet total scales once at the end
+    annual_total_cost = (annualized_capex + diesel_generator_opex + annual_fuel_cost) * number_diesel_generators
+    annual_electricity = annual_fuel_consumption * diesel_generator_efficiency * number_diesel_generators
+    lcoe = annual_total_cost / annual_electricity if annual_electricity > 0 else float('inf')
+
+    return {
+        "annualized_capex": annualized_capex,
+        "annual_opex": diesel_generator_opex,
+        "annual_fuel_cost": annual_fuel_cost,
+        "annual_total_cost": annual_total_cost,
+        "annual_electricity": annual_electricity,
+        "lcoe": lcoe
+    }
+
+
+@st.cache_data(max_entries=256)
+def calculate_os4p(params):
+    # Optional detailed CAPEX components (for visualization only)
+    detailed_capex = params.get("detailed_capex", None)
+
+    # Emissions are shared with the vectorized sensitivity path; unwrap to plain floats here
+    emissions = {key: float(value) for key, value in calculate_os4p_vec(params)._asdict().items()}
+    ghg_abs_avoidance_total = emissions["ghg_abs_avoidance_total"]
+    ghg_abs_avoidance_lifetime = emissions["ghg_abs_avoidance_lifetime"]
+
+    financials = calculate_financials(
+        params["num_outposts"],
+        params["total_capex_per_outpost"],
+        params["maintenance_opex"],
+        params["communications_opex"],
+        params["security_opex"],
+        params.get("non_unit_cost_pct", 0),
+        params["interest_rate"],
+        params["loan_years"],
+        params["sla_premium"],
+        params["annual_energy_production"]
+    )
+    total_grant = financials["total_grant"]
+
+    cost_efficiency_per_ton = total_grant / ghg_abs_avoidance_total if ghg_abs_avoidance_total > 0 else float('inf')
+    cost_efficiency_lifetime = total_grant / ghg_abs_avoidance_lifetime if ghg_abs_avoidance_lifetime > 0 else float('inf')
+
+    innovation_fund_score = calculate_innovation_fund_score(cost_efficiency_per_ton)
+    innovation_fund_score_lifetime = calculate_innovation_fund_score(cost_efficiency_lifetime)
+
+    result = {
+        **emissions,
+        **financials,
+        "cost_efficiency_per_ton": cost_efficiency_per_ton,
+        "cost_efficiency_lifetime": cost_efficiency_lifetime,
+        "innovation_fund_score": innovation_fund_score,
+        "innovation_fund_score_lifetime": innovation_fund_score_lifetime
+    }
+
+    if detailed_capex:
+        result["detailed_capex_breakdown"] = detailed_capex
+
+    return result
+
+
+@st.cache_data(max_entries=256)
+def perform_sensitivity_analysis(params, selected_param, range_values):
+    result = calculate_os4p_vec(params, {selected_param: np.asarray(range_values, dtype=np.float64)})
+
+    # The grant does not depend on any swept (emissions) parameter, so the base case supplies it
+    total_grant = calculate_os4p(params)["total_grant"]
+    avoidance = result.ghg_abs_avoidance_total
+    cost_efficiency = np.divide(total_grant, avoidance, out=np.full(avoidance.shape, np.inf), where=avoidance > 0)
+
+    return pd.DataFrame({
+        'Parameter_Value': range_values,
+        'Absolute_Avoidance_Total': avoidance,
+        'Manned_CO2_Emissions': result.manned_co2_emissions,
+        'Autonomous_CO2_Emissions': result.autonomous_co2_emissions,
+        'Relative_Avoidance': result.ghg_rel_avoidance,
+        'Innovation_Fund_Score': calculate_innovation_fund_score_vec(cost_efficiency)
+    })
+
+
+@st.cache_data(max_entries=256)
+def perform_tornado_analysis(params, tornado_params, variation_pct, base_avoidance):
+    """
+    Change in annual GHG avoidance when each tornado parameter moves down/up by variation_pct.
+
+    Returns a (parameters x [low, high]) array. Cached like the single-parameter sweep, so
+    resubmitting an unchanged tornado form skips the model call.
+    """
+    # One (parameters x [low, high]) grid: row i varies only tornado_params[i] and keeps
+    # every other parameter at its base value, so the whole chart is a single model call
+    factors = np.array([1 - variation_pct / 100, 1 + variation_pct / 100])
+    is_varied = np.eye(len(tornado_params), dtype=bool)
+    varied_params = {
+        param: np.where(is_varied[:, i, None], params[param] * factors, params[param])
+        for i, param in enumerate(tornado_params)
+    }
+    # Only the emissions half of the model depends on these parameters
+    result = calculate_os4p_vec(params, varied_params)
+    return result.ghg_abs_avoidance_total - base_avoidance